@@ -1,17 +1,15 @@
 import streamlit as st
 import pandas as pd
-import geopandas as gpd
-import folium
-from streamlit_folium import st_folium
-from shapely import wkt
-from shapely.errors import WKTReadingError
-import plotly.express as px
+import numpy as np
 import sqlite3
 import hashlib
+import hmac
+import os
+import threading
 
-# UI libraries
-from streamlit_option_menu import option_menu
-from streamlit_extras.metric_cards import style_metric_cards
+# The geospatial/plotting stack (geopandas, shapely, folium, plotly) and the
+# extra UI widgets are imported lazily inside the functions that need them:
+# the login page never touches them, so cold starts skip ~100 MB of imports.
 
 # ==========================
 # PAGE CONFIGURATION
@@ -22,93 +20,267 @@ st.set_page_config(
     layout="wide"
 )
 
+# ==========================
+# STATIC CSS
+# ==========================
+# None of these change between reruns, so they are built once at import
+# time instead of re-interpolated inside the page functions.
+_BG_IMAGE_URL = "https://www.detourista.com/wp/wp-content/uploads/Tax-Place/Philippines/Iloilo/Iloilo/Featured/001-Calle-Real-in-Iloilo-City-150105-063819.jpg"
+_MANAGE_BG_IMAGE_URL = "https://dynamic-media-cdn.tripadvisor.com/media/photo-o/1a/ff/86/7b/pictures-at-the-iloilo.jpg?w=1200&h=-1&s=1"
+
+DARK_CSS = """
+<style>
+.stApp {background-color: #121212; color: #E0E0E0;}
+[data-testid="stHeader"] {background-color: #111318;}
+div[data-testid="stMetricValue"] {color: #00ADB5 !important; text-shadow: 0px 0px 6px rgba(0,173,181,0.7);}
+section[data-testid="stSidebar"] {background-color: #111318; color: #EEE;}
+</style>
+"""
+
+LIGHT_CSS = """
+<style>
+.stApp {background-color: #F5F6FA; color: #000000;}
+[data-testid="stHeader"] {background-color: #E0E0E0;}
+div[data-testid="stMetricValue"] {color: #000000 !important;}
+section[data-testid="stSidebar"] {background-color: #FFFFFF; color: #000000;}
+</style>
+"""
+
+# Shared by City Overview and Barangay Deep Dive.
+DASHBOARD_BG_CSS = f"""
+<style>
+[data-testid="stAppViewContainer"] {{
+    background-image: linear-gradient(rgba(18, 18, 18, 0.85), rgba(18, 18, 18, 0.85)),
+                      url("{_BG_IMAGE_URL}");
+    background-size: cover;
+    background-position: center;
+    background-attachment: fixed;
+    background-repeat: no-repeat;
+}}
+</style>
+"""
+
+MANAGE_BG_CSS = f"""
+<style>
+/* Full page background */
+[data-testid="stAppViewContainer"] {{
+    background-image: linear-gradient(rgba(18, 18, 18, 0.85), rgba(18, 18, 18, 0.85)),
+                      url("{_MANAGE_BG_IMAGE_URL}");
+    background-size: cover;
+    background-position: center;
+    background-attachment: fixed;
+    background-repeat: no-repeat;
+}}
+</style>
+"""
+
+LOGIN_CSS = f"""
+<style>
+/* Full page background */
+[data-testid="stAppViewContainer"] {{
+    background-image: linear-gradient(rgba(0, 0, 0, 0.4), rgba(0, 0, 0, 0.4)),
+                      url("{_BG_IMAGE_URL}");
+    background-size: cover;
+    background-position: center;
+    background-attachment: fixed;
+    background-repeat: no-repeat;
+}}
+
+/* Hide header completely */
+[data-testid="stHeader"] {{
+    display: none;
+}}
+
+/* Hide sidebar on login page */
+[data-testid="stSidebar"] {{
+    display: none;
+}}
+
+/* Center the login form */
+.block-container {{
+    max-width: 500px !important;
+    padding-top: 5rem !important;
+}}
+
+/* Glass effect card */
+div[data-testid="stVerticalBlock"] > div:first-child {{
+    background: rgba(255, 255, 255, 0.1);
+    padding: 3rem 2rem;
+    border-radius: 20px;
+    backdrop-filter: blur(10px);
+    border: 1px solid rgba(255, 255, 255, 0.2);
+    box-shadow: 0 8px 32px 0 rgba(0, 0, 0, 0.37);
+}}
+
+/* Black text for title */
+h1 {{
+    color: black !important;
+    text-align: center;
+    text-shadow: 2px 2px 4px rgba(255,255,255,0.8);
+    font-weight: bold;
+}}
+
+/* Style labels */
+label {{
+    color: black !important;
+    font-weight: 600;
+}}
+
+/* Style inputs */
+.stTextInput > div > div > input {{
+    background-color: rgba(255, 255, 255, 0.95);
+    border-radius: 8px;
+    color: black !important;
+}}
+
+/* Style error messages */
+.stAlert {{
+    background-color: rgba(255, 255, 255, 0.95) !important;
+}}
+
+/* Style buttons */
+.stButton > button {{
+    width: 100%;
+    background-color: #00ADB5;
+    color: white;
+    border-radius: 8px;
+    font-weight: 600;
+    border: none;
+}}
+
+.stButton > button:hover {{
+    background-color: #008C94;
+}}
+
+/* Style the divider */
+hr {{
+    border-color: rgba(255, 255, 255, 0.3);
+}}
+</style>
+"""
+
 # ==========================
 # DATABASE FUNCTIONS
 # ==========================
-def hash_password(password):
-    return hashlib.sha256(str.encode(password)).hexdigest()
+def hash_password(password, salt=None):
+    """Derive a salted scrypt hash; the stored value is hex(salt || key)."""
+    if salt is None:
+        salt = os.urandom(16)
+    key = hashlib.scrypt(password.encode('utf-8'), salt=salt, n=16384, r=8, p=1, dklen=32)
+    return (salt + key).hex()
+
+def verify_password(password, stored_hash):
+    if len(stored_hash) == 64:
+        # Legacy unsalted SHA-256 entry from before the scrypt migration.
+        return hmac.compare_digest(stored_hash, hashlib.sha256(password.encode('utf-8')).hexdigest())
+    salt = bytes.fromhex(stored_hash[:32])
+    return hmac.compare_digest(stored_hash, hash_password(password, salt))
+
+# Serializes writes on the shared connection; Streamlit serves sessions
+# from multiple threads.
+_write_lock = threading.Lock()
+
+@st.cache_resource(show_spinner=False)
+def get_conn():
+    """One shared connection per process; connect() per call costs more
+    than the queries themselves."""
+    conn = sqlite3.connect('users.db', check_same_thread=False, isolation_level=None)
+    conn.executescript(
+        "PRAGMA journal_mode=WAL;"
+        "PRAGMA synchronous=NORMAL;"
+        "PRAGMA temp_store=MEMORY;"
+        "PRAGMA cache_size=-64000;"
+    )
+    return conn
 
+@st.cache_resource(show_spinner=False)
 def init_db():
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    c.execute('''
-    CREATE TABLE IF NOT EXISTS users (
-        username TEXT PRIMARY KEY,
-        password_hash TEXT
-    )
-    ''')
-    conn.commit()
-    conn.close()
+    """Schema setup runs once per process, not on every script rerun."""
+    conn = get_conn()
+    with _write_lock, conn:
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            password_hash TEXT
+        )
+        ''')
 
 def create_user(username, password):
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
+    conn = get_conn()
     try:
-        c.execute("INSERT INTO users (username, password_hash) VALUES (?, ?)",
-                  (username, hash_password(password)))
-        conn.commit()
+        with _write_lock, conn:
+            conn.execute("INSERT INTO users (username, password_hash) VALUES (?, ?)",
+                         (username, hash_password(password)))
         return True
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
 
 def check_user_password(username, password):
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    c.execute("SELECT password_hash FROM users WHERE username = ?", (username,))
-    data = c.fetchone()
-    conn.close()
-    if data:
-        return data[0] == hash_password(password)
-    return False
+    conn = get_conn()
+    row = conn.execute("SELECT password_hash FROM users WHERE username = ?", (username,)).fetchone()
+    if row is None:
+        # Unknown user: skip the hash derivation entirely.
+        return False
+    return verify_password(password, row[0])
 
 def update_user_password(username, new_password):
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    c.execute("UPDATE users SET password_hash = ? WHERE username = ?",
-              (hash_password(new_password), username))
-    conn.commit()
-    conn.close()
+    conn = get_conn()
+    with _write_lock, conn:
+        conn.execute("UPDATE users SET password_hash = ? WHERE username = ?",
+                     (hash_password(new_password), username))
     return True
 
 def delete_user(username):
-    conn = sqlite3.connect('users.db')
-    c = conn.cursor()
-    c.execute("DELETE FROM users WHERE username = ?", (username,))
-    conn.commit()
-    conn.close()
+    conn = get_conn()
+    with _write_lock, conn:
+        conn.execute("DELETE FROM users WHERE username = ?", (username,))
     return True
 
 # ==========================
 # DATA LOADING FUNCTIONS
 # ==========================
-@st.cache_data
+# Every column the dashboard touches: map key, tooltip fields, KPI means,
+# layer metrics, and the WKT/name source columns. The CSV carries a dozen
+# more that never leave the loader.
+USECOLS = [
+    'adm4_pcode', 'urban_risk_index', 'infra_index', 'rwi_mean',
+    'climate_exposure_score', 'pop_total', 'risk_level', 'risk_label',
+    'infra_risk', 'coast_risk', 'ndvi_risk', 'pop_risk', 'rwi_risk',
+    'brgy_names-ILOILO.geometry', 'brgy_names-ILOILO.location.adm4_en',
+]
+CSV_DTYPES = {'risk_label': 'category', 'risk_level': 'category', 'adm4_pcode': 'category'}
+
+@st.cache_resource(show_spinner=False)
 def load_data(csv_path, encoding='utf-8'):
-    def parse_wkt(wkt_string):
-        if not isinstance(wkt_string, str):
-            return None
+    import geopandas as gpd
+    import shapely
+
+    # Warm start: reuse the GeoParquet cache written on a previous run so we
+    # skip the CSV read and WKT parse entirely when the CSV is unchanged.
+    pq_path = csv_path + '.parquet'
+    if os.path.exists(pq_path) and os.path.getmtime(pq_path) >= os.path.getmtime(csv_path):
+        gdf = gpd.read_parquet(pq_path)
+    else:
         try:
-            return wkt.loads(wkt_string)
-        except (WKTReadingError, TypeError):
-            return None
-
-    df = pd.read_csv(csv_path, encoding=encoding)
-    df['geometry'] = df['brgy_names-ILOILO.geometry'].apply(parse_wkt)
-    df.dropna(subset=['geometry', 'urban_risk_index'], inplace=True)
-    gdf = gpd.GeoDataFrame(df, geometry='geometry')
-    gdf.set_crs(epsg=4326, inplace=True)
-    return gdf
-
-@st.cache_data
-def load_amenity_data(path):
-    return pd.read_csv(path, encoding='latin1')
+            # Arrow's multi-threaded CSV reader; fall back to the C engine
+            # when pyarrow is missing or rejects an option.
+            df = pd.read_csv(csv_path, encoding=encoding, usecols=USECOLS,
+                             dtype=CSV_DTYPES, engine='pyarrow')
+        except (ImportError, ValueError):
+            df = pd.read_csv(csv_path, encoding=encoding, usecols=USECOLS, dtype=CSV_DTYPES)
+        # Parse all WKT strings in one vectorized call instead of row-by-row;
+        # invalid/missing entries come back as None and are dropped below.
+        wkt_strings = df['brgy_names-ILOILO.geometry'].where(df['brgy_names-ILOILO.geometry'].notna(), None)
+        df['geometry'] = shapely.from_wkt(wkt_strings.to_numpy(dtype=object), on_invalid='ignore')
+        df.dropna(subset=['geometry', 'urban_risk_index'], inplace=True)
+        gdf = gpd.GeoDataFrame(df, geometry='geometry')
+        gdf.set_crs(epsg=4326, inplace=True)
+        try:
+            gdf.to_parquet(pq_path, compression='zstd')
+        except (OSError, ImportError):
+            pass  # read-only filesystem or no pyarrow; just skip the cache
 
-# ==========================
-# DASHBOARD BUILDER
-# ==========================
-def build_dashboard(gdf, df2):
-    # --- Standardize Barangay Names for gdf ---
+    # --- Standardize Barangay Names ---
     if 'brgy_names-ILOILO.location.adm4_en' in gdf.columns:
         gdf['barangay_name'] = gdf['brgy_names-ILOILO.location.adm4_en']
     elif 'location1.adm4_en' in gdf.columns:
@@ -116,34 +288,194 @@ def build_dashboard(gdf, df2):
     else:
         gdf['barangay_name'] = None
 
-    # --- Standardize Barangay Names for df2 ---
-    if 'location1.adm4_en' in df2.columns:
-        df2['barangay_name'] = df2['location1.adm4_en']
+    # ~10 m tolerance is invisible at the zoom levels we render, and it cuts
+    # vertex count for every downstream serialization, deep dive included.
+    gdf['geometry'] = gdf.geometry.simplify(0.0001, preserve_topology=True)
+
+    # Precompute everything the dashboard needs on every rerun, so widget
+    # clicks cost dict lookups instead of full-table scans.
+    gdf.attrs['means'] = gdf[['urban_risk_index', 'infra_index', 'rwi_mean', 'climate_exposure_score']].mean().to_dict()
+    gdf.attrs['by_name'] = {n: i for i, n in enumerate(gdf['barangay_name'])}
+    gdf.attrs['brgy_list'] = tuple(sorted(pd.unique(gdf['barangay_name'].dropna())))
+    gdf.attrs['brgy_list_lower'] = tuple(b.lower() for b in gdf.attrs['brgy_list'])
+    # Plain array, not a frame: pandas compares attrs in __finalize__, and a
+    # DataFrame in there breaks equality checks on newer pandas.
+    gdf.attrs['pcodes'] = gdf['adm4_pcode'].to_numpy()
+
+    # Centroid coordinates for every barangay in one vectorized GEOS call;
+    # the deep dive reads the scalars straight off its row.
+    cents = shapely.centroid(gdf.geometry.values)
+    gdf['_cx'] = shapely.get_x(cents)
+    gdf['_cy'] = shapely.get_y(cents)
+
+    # Serialize the map payload once: simplified geometries keep the visual
+    # shape at a fraction of the vertices, and folium accepts the GeoJSON
+    # string directly instead of walking every geometry per rerun. Only the
+    # columns the choropleth key and tooltips reference go into properties.
+    map_cols = ['adm4_pcode', 'barangay_name', 'urban_risk_index', 'risk_level',
+                'infra_risk', 'climate_exposure_score', 'coast_risk', 'ndvi_risk',
+                'pop_risk', 'rwi_risk', 'pop_total', 'infra_index']
+    simplified = gdf.geometry.simplify(tolerance=0.0005, preserve_topology=True)
+    map_gdf = gpd.GeoDataFrame(gdf[map_cols], geometry=simplified, crs=gdf.crs)
+    try:
+        import orjson
+        gdf.attrs['geojson'] = orjson.dumps(
+            map_gdf.__geo_interface__, option=orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+    except ImportError:
+        gdf.attrs['geojson'] = map_gdf.to_json()
+    return gdf
+
+@st.cache_resource(show_spinner=False)
+def load_amenity_data(path):
+    # Same warm-start scheme as load_data: a Parquet sidecar skips the CSV
+    # parse whenever the source file is unchanged.
+    pq_path = path + '.parquet'
+    if os.path.exists(pq_path) and os.path.getmtime(pq_path) >= os.path.getmtime(path):
+        return pd.read_parquet(pq_path)
+
+    df = pd.read_csv(path, encoding='latin1')
+    # --- Standardize Barangay Names ---
+    if 'location1.adm4_en' in df.columns:
+        df['barangay_name'] = df['location1.adm4_en']
     else:
-        df2['barangay_name'] = None
+        df['barangay_name'] = None
+    # Hash-indexed by name so the deep dive looks rows up in O(1)
+    # instead of scanning the whole frame per click.
+    df.set_index('barangay_name', inplace=True)
+    try:
+        df.to_parquet(pq_path, compression='zstd')
+    except (OSError, ImportError):
+        pass  # read-only filesystem or no pyarrow; just skip the cache
+    return df
+
+# ==========================
+# DASHBOARD BUILDER
+# ==========================
+AMENITY_COLS = ['college_nearest', 'community_centre_nearest', 'school_nearest',
+                'shelter_nearest', 'town_hall_nearest', 'university_nearest']
+AMENITY_LABELS = ['College', 'Community Centre', 'School', 'Shelter', 'Town Hall', 'University']
+
+LAYER_CONFIG = {
+    "Urban Risk": {"col": "urban_risk_index", "color": "YlOrRd", "legend": "Urban Risk Index"},
+    "Population": {"col": "pop_total", "color": "Blues", "legend": "Population Total"},
+    "Amenity": {"col": "infra_index", "color": "Reds", "legend": "Amenity Index"},
+    "Climate Exposure": {"col": "climate_exposure_score", "color": "Greens", "legend": "Climate Exposure Score"},
+}
+
+@st.cache_resource(show_spinner=False, hash_funcs={"geopandas.geodataframe.GeoDataFrame": id})
+def build_overview_map(gdf, selected_layer):
+    """Build the City Overview map once per layer; the map is read-only so
+    the same object can be re-rendered on every rerun."""
+    import folium
+
+    col_config = LAYER_CONFIG[selected_layer]
+    metric_col = col_config["col"]
+    legend_name = col_config["legend"]
+
+    iloilo_center = [10.7202, 122.5621]
+    m = folium.Map(location=iloilo_center, zoom_start=13)
+
+    # Hand folium just the two columns it needs, not the whole frame.
+    cdata = pd.DataFrame({'adm4_pcode': gdf.attrs['pcodes'],
+                          metric_col: gdf[metric_col].to_numpy()})
+    folium.Choropleth(
+        geo_data=gdf.attrs['geojson'],
+        data=cdata,
+        columns=['adm4_pcode', metric_col],
+        key_on='feature.properties.adm4_pcode',
+        fill_color=col_config["color"],
+        fill_opacity=0.7,
+        line_opacity=0.2,
+        legend_name=legend_name
+    ).add_to(m)
+
+    if selected_layer == "Urban Risk":
+        tooltip_fields = [
+            'barangay_name',
+            'urban_risk_index',
+            'risk_level',
+            'infra_risk',
+            'climate_exposure_score',
+            'coast_risk',
+            'ndvi_risk',
+            'pop_risk',
+            'rwi_risk'
+        ]
+        tooltip_aliases = [
+            'Barangay:',
+            'Urban Risk Index:',
+            'Risk Level:',
+            'Climate Vulnerability Index:',
+            'Climate Exposure Score:',
+            'Coastal Distance Risk Score:',
+            'NDVI Risk Score:',
+            'Population Risk Score:',
+            'Relative Wealth Index (RWI) Risk Score:'
+        ]
+    else:
+        tooltip_fields = ['barangay_name', metric_col]
+        tooltip_aliases = ['Barangay:', legend_name + ":"]
+
+    folium.GeoJson(
+        gdf.attrs['geojson'],
+        tooltip=folium.GeoJsonTooltip(fields=tooltip_fields, aliases=tooltip_aliases, localize=True)
+    ).add_to(m)
+    return m
+
+@st.cache_resource(show_spinner=False, hash_funcs={"geopandas.geodataframe.GeoDataFrame": id})
+def build_top5_fig(gdf, selected_layer):
+    import plotly.express as px
+
+    col_config = LAYER_CONFIG[selected_layer]
+    metric_col = col_config["col"]
+    legend_name = col_config["legend"]
+
+    # O(n) partition instead of a full sort to pick the top 5; tiny frames
+    # just sort outright since argpartition needs kth < size.
+    vals = gdf[metric_col].to_numpy()
+    if vals.size > 5:
+        idx = np.argpartition(-vals, 5)[:5]
+        idx = idx[np.argsort(-vals[idx])]
+    else:
+        idx = np.argsort(-vals)
+    top_5_df = gdf.iloc[idx][['barangay_name', metric_col]].rename(
+        columns={'barangay_name': 'Barangay', metric_col: legend_name})
+    fig = px.bar(top_5_df, x='Barangay', y=legend_name, title=f"Top 5 Barangays by {legend_name}",
+                 color=legend_name, color_continuous_scale=col_config["color"], text=legend_name)
+    fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig
+
+@st.cache_resource(show_spinner=False, hash_funcs={"geopandas.geodataframe.GeoDataFrame": id})
+def build_distribution_fig(gdf, selected_layer):
+    import plotly.express as px
+
+    col_config = LAYER_CONFIG[selected_layer]
+    metric_col = col_config["col"]
+    legend_name = col_config["legend"]
+
+    color_map = {"YlOrRd": "#F4A261", "Blues": "#1E90FF", "Reds": "#E63946", "Greens": "#2A9D8F"}
+    hist_color = color_map.get(col_config["color"], "#00ADB5")
+    fig = px.histogram(x=gdf[metric_col].to_numpy(), nbins=20,
+                       title=f"Distribution of {legend_name}", labels={'x': metric_col})
+    fig.update_traces(marker_color=hist_color, opacity=0.8)
+    return fig
+
+def build_dashboard(gdf, df2):
+    import folium
+    import plotly.express as px
+    from streamlit_folium import folium_static
+    from streamlit_option_menu import option_menu
+    from streamlit_extras.metric_cards import style_metric_cards
 
     dark_mode = st.sidebar.toggle("🌗 Dark Mode", value=True)
     
     # Apply theme
+    st.markdown(DARK_CSS if dark_mode else LIGHT_CSS, unsafe_allow_html=True)
     if dark_mode:
-        st.markdown("""
-        <style>
-        .stApp {background-color: #121212; color: #E0E0E0;}
-        [data-testid="stHeader"] {background-color: #111318;}
-        div[data-testid="stMetricValue"] {color: #00ADB5 !important; text-shadow: 0px 0px 6px rgba(0,173,181,0.7);}
-        section[data-testid="stSidebar"] {background-color: #111318; color: #EEE;}
-        </style>
-        """, unsafe_allow_html=True)
         metric_style = dict(background_color="#1E1E1E", border_left_color="#00ADB5", border_color="#2C2C2C")
     else:
-        st.markdown("""
-        <style>
-        .stApp {background-color: #F5F6FA; color: #000000;}
-        [data-testid="stHeader"] {background-color: #E0E0E0;}
-        div[data-testid="stMetricValue"] {color: #000000 !important;}
-        section[data-testid="stSidebar"] {background-color: #FFFFFF; color: #000000;}
-        </style>
-        """, unsafe_allow_html=True)
         metric_style = dict(background_color="#FFFFFF", border_left_color="#00ADB5", border_color="#DDDDDD")
 
     # Sidebar Navigation
@@ -176,23 +508,8 @@ def build_dashboard(gdf, df2):
     # City Overview
     # =====================
     if selected == "City Overview":
-        # Add background image for City Overview
-        background_image_url = "https://www.detourista.com/wp/wp-content/uploads/Tax-Place/Philippines/Iloilo/Iloilo/Featured/001-Calle-Real-in-Iloilo-City-150105-063819.jpg"
-        
-        city_overview_bg = f"""
-        <style>
-        [data-testid="stAppViewContainer"] {{
-            background-image: linear-gradient(rgba(18, 18, 18, 0.85), rgba(18, 18, 18, 0.85)), 
-                              url("{background_image_url}");
-            background-size: cover;
-            background-position: center;
-            background-attachment: fixed;
-            background-repeat: no-repeat;
-        }}
-        </style>
-        """
-        st.markdown(city_overview_bg, unsafe_allow_html=True)
-        
+        st.markdown(DASHBOARD_BG_CSS, unsafe_allow_html=True)
+
         st.title("Iloilo City: Climate Vulnerability Index")
 
         # Sidebar map selector
@@ -201,21 +518,10 @@ def build_dashboard(gdf, df2):
             ["Urban Risk", "Population", "Amenity", "Climate Exposure"]
         )
 
-        layer_config = {
-            "Urban Risk": {"col": "urban_risk_index", "color": "YlOrRd", "legend": "Urban Risk Index"},
-            "Population": {"col": "pop_total", "color": "Blues", "legend": "Population Total"},
-            "Amenity": {"col": "infra_index", "color": "Reds", "legend": "Amenity Index"},
-            "Climate Exposure": {"col": "climate_exposure_score", "color": "Greens", "legend": "Climate Exposure Score"},
-        }
-
-        col_config = layer_config[selected_layer]
-        metric_col = col_config["col"]
-        color_scale = col_config["color"]
-        legend_name = col_config["legend"]
-
-        avg_risk = gdf['urban_risk_index'].mean()
-        avg_infra = gdf['infra_index'].mean()
-        avg_wealth = gdf['rwi_mean'].mean()
+        means = gdf.attrs['means']
+        avg_risk = means['urban_risk_index']
+        avg_infra = means['infra_index']
+        avg_wealth = means['rwi_mean']
 
         col1, col2, col3 = st.columns(3)
         col1.metric("Average Urban Risk", f"{avg_risk:.2f}")
@@ -223,111 +529,44 @@ def build_dashboard(gdf, df2):
         col3.metric("Average Relative Wealth", f"{avg_wealth:.2f}")
         style_metric_cards(**metric_style, box_shadow=True)
 
-        iloilo_center = [10.7202, 122.5621]
-        m = folium.Map(location=iloilo_center, zoom_start=13)
-
-        folium.Choropleth(
-            geo_data=gdf,
-            data=gdf,
-            columns=['adm4_pcode', metric_col],
-            key_on='feature.properties.adm4_pcode',
-            fill_color=color_scale,
-            fill_opacity=0.7,
-            line_opacity=0.2,
-            legend_name=legend_name
-        ).add_to(m)
-
-        if selected_layer == "Urban Risk":
-            tooltip_fields = [
-                'barangay_name',
-                'urban_risk_index',
-                'risk_level',
-                'infra_risk',
-                'climate_exposure_score',
-                'coast_risk',
-                'ndvi_risk',
-                'pop_risk',
-                'rwi_risk'
-            ]
-            tooltip_aliases = [
-                'Barangay:',
-                'Urban Risk Index:',
-                'Risk Level:',
-                'Climate Vulnerability Index:',
-                'Climate Exposure Score:',
-                'Coastal Distance Risk Score:',
-                'NDVI Risk Score:',
-                'Population Risk Score:',
-                'Relative Wealth Index (RWI) Risk Score:'
-            ]
-        else:
-            tooltip_fields = ['barangay_name', metric_col]
-            tooltip_aliases = ['Barangay:', legend_name + ":"]
-
-        folium.GeoJson(
-            gdf,
-            tooltip=folium.GeoJsonTooltip(fields=tooltip_fields, aliases=tooltip_aliases, localize=True)
-        ).add_to(m)
-
-        st_folium(m, width='100%', height=600)
+        m = build_overview_map(gdf, selected_layer)
+        folium_static(m, width=None, height=600)
 
         tab1, tab2 = st.tabs(["Top 5 Barangays", "Value Distribution"])
         with tab1:
-            top_5 = gdf.nlargest(5, metric_col)
-            top_5_df = top_5[['barangay_name', metric_col]].copy()
-            top_5_df.rename(columns={'barangay_name': 'Barangay', metric_col: legend_name}, inplace=True)
-            fig = px.bar(top_5_df, x='Barangay', y=legend_name, title=f"Top 5 Barangays by {legend_name}",
-                         color=legend_name, color_continuous_scale=color_scale, text=legend_name)
-            fig.update_traces(texttemplate='%{text:.2f}', textposition='outside')
-            fig.update_layout(xaxis_tickangle=-45)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(build_top5_fig(gdf, selected_layer), use_container_width=True)
 
         with tab2:
-            color_map = {"YlOrRd": "#F4A261", "Blues": "#1E90FF", "Reds": "#E63946", "Greens": "#2A9D8F"}
-            hist_color = color_map.get(color_scale, "#00ADB5")
-            fig = px.histogram(gdf, x=metric_col, nbins=20, title=f"Distribution of {legend_name}")
-            fig.update_traces(marker_color=hist_color, opacity=0.8)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(build_distribution_fig(gdf, selected_layer), use_container_width=True)
 
     # =====================
     # Barangay Deep Dive
     # =====================
     elif selected == "Barangay Deep Dive":
-        # Add background image for Barangay Deep Dive
-        background_image_url = "https://www.detourista.com/wp/wp-content/uploads/Tax-Place/Philippines/Iloilo/Iloilo/Featured/001-Calle-Real-in-Iloilo-City-150105-063819.jpg"
-        
-        deep_dive_bg = f"""
-        <style>
-        [data-testid="stAppViewContainer"] {{
-            background-image: linear-gradient(rgba(18, 18, 18, 0.85), rgba(18, 18, 18, 0.85)), 
-                              url("{background_image_url}");
-            background-size: cover;
-            background-position: center;
-            background-attachment: fixed;
-            background-repeat: no-repeat;
-        }}
-        </style>
-        """
-        st.markdown(deep_dive_bg, unsafe_allow_html=True)
-        
+        st.markdown(DASHBOARD_BG_CSS, unsafe_allow_html=True)
+
         st.title("Barangay Deep Dive")
-        brgy_list = sorted(gdf['barangay_name'].dropna().unique())
+        brgy_list = gdf.attrs['brgy_list']
 
         search_query = st.sidebar.text_input("🔍 Search Barangay")
-        filtered_brgy_list = [b for b in brgy_list if search_query.lower() in b.lower()] if search_query else brgy_list
+        if search_query:
+            q = search_query.lower()
+            filtered_brgy_list = [b for b, bl in zip(brgy_list, gdf.attrs['brgy_list_lower']) if q in bl]
+        else:
+            filtered_brgy_list = brgy_list
 
         if len(filtered_brgy_list) == 0:
             st.sidebar.warning("No barangay found. Try a different search.")
             st.stop()
 
         selected_brgy = st.sidebar.selectbox("Select a Barangay", filtered_brgy_list)
-        brgy_data_rows = gdf[gdf['barangay_name'] == selected_brgy]
+        brgy_idx = gdf.attrs['by_name'].get(selected_brgy)
 
-        if brgy_data_rows.empty:
+        if brgy_idx is None:
             st.error("Data not available for this barangay.")
             st.stop()
 
-        brgy_data = brgy_data_rows.iloc[0]
+        brgy_data = gdf.iloc[brgy_idx]
         st.header(f"📍 Dashboard for: {selected_brgy}")
 
         col1, col2, col3 = st.columns(3)
@@ -337,11 +576,11 @@ def build_dashboard(gdf, df2):
         style_metric_cards(**metric_style, box_shadow=True)
 
         # --- Map visualization ---
-        brgy_gdf = gpd.GeoDataFrame([brgy_data], geometry='geometry', crs=gdf.crs)
-        centroid = brgy_gdf.geometry.centroid.iloc[0]
-        m = folium.Map(location=[centroid.y, centroid.x], zoom_start=15)
+        # Slice keeps the GeoDataFrame type and CRS without re-inferring dtypes.
+        brgy_gdf = gdf.iloc[[brgy_idx]]
+        m = folium.Map(location=[brgy_data['_cy'], brgy_data['_cx']], zoom_start=15)
         folium.GeoJson(
-            brgy_gdf,
+            brgy_gdf[['barangay_name', 'urban_risk_index', 'risk_label', 'geometry']],
             style_function=lambda x: {'fillColor': 'blue', 'color': 'blue', 'fillOpacity': 0.5},
             tooltip=folium.GeoJsonTooltip(
                 fields=['barangay_name', 'urban_risk_index', 'risk_label'],
@@ -349,17 +588,20 @@ def build_dashboard(gdf, df2):
                 localize=True
             )
         ).add_to(m)
-        st_folium(m, width='100%', height=500)
+        folium_static(m, width=None, height=500)
 
         # --- Amenity Visualization ---
         st.subheader("🏫 Nearest Amenities Overview")
-        brgy_amenities = df2[df2['barangay_name'] == selected_brgy]
+        brgy_amenities = df2.loc[[selected_brgy]] if selected_brgy in df2.index else df2.iloc[0:0]
 
         if not brgy_amenities.empty:
-            amenity_cols = ['college_nearest', 'community_centre_nearest', 'school_nearest',
-                            'shelter_nearest', 'town_hall_nearest', 'university_nearest']
-            amenity_data = brgy_amenities[amenity_cols].melt(var_name='Amenity Type', value_name='Distance (meters)')
-            amenity_data['Amenity Type'] = amenity_data['Amenity Type'].str.replace('_nearest', '').str.replace('_', ' ').str.title()
+            # Column-major ravel reproduces melt's long-form output (every
+            # matching row, stacked per amenity type) without the .str passes.
+            distances = brgy_amenities[AMENITY_COLS].to_numpy()
+            amenity_data = pd.DataFrame({
+                'Amenity Type': np.repeat(AMENITY_LABELS, len(brgy_amenities)),
+                'Distance (meters)': distances.ravel(order='F'),
+            })
 
             fig = px.bar(
                 amenity_data,
@@ -382,97 +624,7 @@ def build_dashboard(gdf, df2):
 # ==========================
 def show_login_page():
     """Login page with background image from URL"""
-    
-    # Your Iloilo City background image
-    background_image_url = "https://www.detourista.com/wp/wp-content/uploads/Tax-Place/Philippines/Iloilo/Iloilo/Featured/001-Calle-Real-in-Iloilo-City-150105-063819.jpg"
-    
-    # Apply the background styling
-    page_bg_img = f"""
-    <style>
-    /* Full page background */
-    [data-testid="stAppViewContainer"] {{
-        background-image: linear-gradient(rgba(0, 0, 0, 0.4), rgba(0, 0, 0, 0.4)), 
-                          url("{background_image_url}");
-        background-size: cover;
-        background-position: center;
-        background-attachment: fixed;
-        background-repeat: no-repeat;
-    }}
-    
-    /* Hide header completely */
-    [data-testid="stHeader"] {{
-        display: none;
-    }}
-    
-    /* Hide sidebar on login page */
-    [data-testid="stSidebar"] {{
-        display: none;
-    }}
-    
-    /* Center the login form */
-    .block-container {{
-        max-width: 500px !important;
-        padding-top: 5rem !important;
-    }}
-    
-    /* Glass effect card */
-    div[data-testid="stVerticalBlock"] > div:first-child {{
-        background: rgba(255, 255, 255, 0.1);
-        padding: 3rem 2rem;
-        border-radius: 20px;
-        backdrop-filter: blur(10px);
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        box-shadow: 0 8px 32px 0 rgba(0, 0, 0, 0.37);
-    }}
-    
-    /* Black text for title */
-    h1 {{
-        color: black !important;
-        text-align: center;
-        text-shadow: 2px 2px 4px rgba(255,255,255,0.8);
-        font-weight: bold;
-    }}
-    
-    /* Style labels */
-    label {{
-        color: black !important;
-        font-weight: 600;
-    }}
-    
-    /* Style inputs */
-    .stTextInput > div > div > input {{
-        background-color: rgba(255, 255, 255, 0.95);
-        border-radius: 8px;
-        color: black !important;
-    }}
-    
-    /* Style error messages */
-    .stAlert {{
-        background-color: rgba(255, 255, 255, 0.95) !important;
-    }}
-    
-    /* Style buttons */
-    .stButton > button {{
-        width: 100%;
-        background-color: #00ADB5;
-        color: white;
-        border-radius: 8px;
-        font-weight: 600;
-        border: none;
-    }}
-    
-    .stButton > button:hover {{
-        background-color: #008C94;
-    }}
-    
-    /* Style the divider */
-    hr {{
-        border-color: rgba(255, 255, 255, 0.3);
-    }}
-    </style>
-    """
-    
-    st.markdown(page_bg_img, unsafe_allow_html=True)
+    st.markdown(LOGIN_CSS, unsafe_allow_html=True)
 
     # Login form content
     st.title("🌍 KLIMATA: Urban Risk Assessment Portal")
@@ -521,24 +673,8 @@ def show_signup_page():
         st.rerun()
 
 def show_manage_account_page():
-    # Add background image for Manage Account page
-    background_image_url = "https://dynamic-media-cdn.tripadvisor.com/media/photo-o/1a/ff/86/7b/pictures-at-the-iloilo.jpg?w=1200&h=-1&s=1"
-    
-    manage_bg = f"""
-    <style>
-    /* Full page background */
-    [data-testid="stAppViewContainer"] {{
-        background-image: linear-gradient(rgba(18, 18, 18, 0.85), rgba(18, 18, 18, 0.85)), 
-                          url("{background_image_url}");
-        background-size: cover;
-        background-position: center;
-        background-attachment: fixed;
-        background-repeat: no-repeat;
-    }}
-    </style>
-    """
-    st.markdown(manage_bg, unsafe_allow_html=True)
-    
+    st.markdown(MANAGE_BG_CSS, unsafe_allow_html=True)
+
     st.title(f"Manage Account: {st.session_state['username']}")
     if st.sidebar.button("Back to Dashboard"):
         st.session_state.page = "Dashboard"